@@ -1,21 +1,55 @@
 #!/usr/bin/env python3
 
 import argparse
+import datetime
 import os
 import re
+import struct
 import sys
-from typing import Iterable, List, Set, Tuple
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np  # optional: vectorized engine
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
 
 
 US_COUNTRY_CODE = "1"
 
+ENGINES = ("auto", "python", "numpy")
+
+# Vectorized engine: lines up to this many bytes go into the byte matrix,
+# longer/odd lines fall back to normalize_us_number.
+NUMPY_LINE_WIDTH = 16
+NUMPY_CHUNK_LINES = 1 << 18
+
+# History store: last-seen day kept as uint16 days since this epoch.
+HISTORY_EPOCH = datetime.date(2020, 1, 1)
+HISTORY_MAGIC = b"USHIST1\n"
+
+
+class _DecimalToAscii(dict):
+    """str.translate table: any Unicode decimal digit (e.g. full-width ４) → ASCII."""
+
+    def __missing__(self, cp: int):
+        d = unicodedata.decimal(chr(cp), None)
+        value = cp if d is None else str(d)
+        self[cp] = value
+        return value
+
+
+_DIGITS_TO_ASCII = _DecimalToAscii()
+
 
 def normalize_us_number(raw: str) -> Tuple[bool, str]:
     """
     Normalize a raw phone string to E.164 for US numbers: +1XXXXXXXXXX.
 
     Rules:
-    - Keep digits only; ignore spaces, dashes, parentheses, dots, etc.
+    - Keep digits only (full-width/other Unicode digits become ASCII); ignore spaces, dashes, parentheses, dots, etc.
     - Accept 10-digit NANP numbers → +1XXXXXXXXXX（严格 NANP：NXX NXX XXXX，N=2-9）
     - Accept 11 digits starting with 1 → treat as country code +1 → +1XXXXXXXXXX
     - Accept numbers starting with +1 followed by 10 digits
@@ -27,14 +61,16 @@ def normalize_us_number(raw: str) -> Tuple[bool, str]:
         return False, ""
 
     s = raw.strip()
+    if not s.isascii():
+        s = s.translate(_DIGITS_TO_ASCII)
     # Remove common extension markers like x123, ext123 (ignore extensions)
     s = re.split(r"(?i)\bext\b|\bx\b|#", s)[0]
 
     # Keep leading + for detection, strip other non-digits
     if s.startswith("+"):
-        digits = "+" + re.sub(r"\D", "", s[1:])
+        digits = "+" + re.sub(r"[^0-9]", "", s[1:])
     else:
-        digits = re.sub(r"\D", "", s)
+        digits = re.sub(r"[^0-9]", "", s)
 
     # Handle +1XXXXXXXXXX
     if digits.startswith("+" + US_COUNTRY_CODE):
@@ -60,11 +96,11 @@ def normalize_us_number(raw: str) -> Tuple[bool, str]:
 def _is_valid_nanp_10(d: str) -> bool:
     """Return True if string is a valid 10-digit NANP number (NXX NXX XXXX).
     Rules:
-    - Must be 10 digits
+    - Must be 10 ASCII digits
     - Area code (d[0:3]) and central office code (d[3:6]) must start with 2-9
     - Disallow N11 as central office (d[4:6] == '11')
     """
-    if len(d) != 10 or not d.isdigit():
+    if len(d) != 10 or not d.isascii() or not d.isdigit():
         return False
     if d[0] in "01" or d[3] in "01":
         return False
@@ -74,13 +110,160 @@ def _is_valid_nanp_10(d: str) -> bool:
     return True
 
 
-def dedupe_numbers(lines: Iterable[str], keep_order: bool = True) -> List[str]:
+def pack_e164(e164: str) -> int:
+    """Pack +1XXXXXXXXXX into its 10-digit integer (fits uint64)."""
+    return int(e164[2:])
+
+
+def unpack_e164(packed: int) -> str:
+    """Inverse of pack_e164. 0 is never a valid packed number."""
+    return "+" + US_COUNTRY_CODE + str(int(packed))
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def resolve_engine(engine: str) -> str:
+    """Map 'auto' to a concrete engine; raise ValueError if unusable."""
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine: {engine}")
+    if engine == "auto":
+        return "numpy" if np is not None else "python"
+    if engine == "numpy" and np is None:
+        raise ValueError("numpy engine requested but numpy is not installed")
+    return engine
+
+
+if np is not None:
+    _POW10 = np.array([10 ** i for i in range(12)], dtype=np.uint64)
+    # Bytes the fast path understands; anything else (letters for ext/x,
+    # '#', non-ASCII, ...) sends the line to the scalar path.
+    _FAST_BYTES = np.zeros(256, dtype=bool)
+    _FAST_BYTES[list(b"0123456789+-(). \t\r\v\f")] = True
+    _SPACE_BYTES = np.zeros(256, dtype=bool)
+    _SPACE_BYTES[list(b" \t\r\v\f")] = True
+
+
+def pack_us_numbers(lines: Sequence[str]) -> "np.ndarray":
+    """
+    Vectorized normalize_us_number for a chunk of lines.
+
+    Returns a uint64 array (one entry per line) holding the packed 10-digit
+    number, or 0 where the line is not a valid US number. Short lines made of
+    digits and common separators are decoded as a byte matrix; everything
+    else (extensions, long or non-ASCII lines) goes through the scalar path.
+    """
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+    n = len(lines)
+    out = np.zeros(n, dtype=np.uint64)
+    if n == 0:
+        return out
+    width = NUMPY_LINE_WIDTH
+
+    # One encode for the whole chunk, then slice rows out by offset.
+    try:
+        buf = np.frombuffer(("\n".join(lines) + "\n").encode("utf-8", "surrogateescape"), dtype=np.uint8)
+    except UnicodeEncodeError:
+        # lone surrogates: give up on the matrix for this chunk
+        return _pack_scalar(lines, out)
+    ends = np.flatnonzero(buf == 10)
+    if len(ends) != n:
+        # embedded newlines: give up on the matrix for this chunk
+        return _pack_scalar(lines, out)
+    starts = np.empty(n, dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    lengths = ends - starts
+
+    cols = np.arange(width)
+    in_line = cols[None, :] < lengths[:, None]
+    idx = np.minimum(starts[:, None] + cols[None, :], len(buf) - 1)
+    mat = np.where(in_line, buf[idx], np.uint8(32))
+
+    fast = (lengths <= width) & _FAST_BYTES[mat].all(axis=1)
+
+    is_digit = (mat >= 48) & (mat <= 57)
+    ndigits = is_digit.sum(axis=1)
+    # leading '+' (after whitespace) only matters for the 10-digit case
+    first = np.argmax(~_SPACE_BYTES[mat], axis=1)
+    has_plus = mat[np.arange(n), first] == 43
+
+    # Place value of each digit counted from the right.
+    rank = ndigits[:, None] - np.cumsum(is_digit, axis=1)
+    weight = np.where(is_digit & (rank < 11), _POW10[np.clip(rank, 0, 11)], np.uint64(0))
+    value = ((mat.astype(np.uint64) - np.uint64(48)) * weight).sum(axis=1, dtype=np.uint64)
+
+    lead = value // _POW10[10]
+    ten = value % _POW10[10]
+    shape_ok = ((ndigits == 11) & (lead == 1)) | ((ndigits == 10) & ~has_plus)
+    area_ok = (ten // _POW10[9]) >= 2
+    exch_ok = (ten // _POW10[6]) % np.uint64(10) >= 2
+    n11 = (ten // _POW10[4]) % np.uint64(100) == 11
+    valid = fast & shape_ok & area_ok & exch_ok & ~n11
+    out[valid] = ten[valid]
+
+    for i in np.flatnonzero(~fast):
+        ok, e164 = normalize_us_number(lines[i])
+        if ok:
+            out[i] = pack_e164(e164)
+    return out
+
+
+def _pack_scalar(lines: Sequence[str], out: "np.ndarray") -> "np.ndarray":
+    for i, line in enumerate(lines):
+        ok, e164 = normalize_us_number(line)
+        if ok:
+            out[i] = pack_e164(e164)
+    return out
+
+
+def iter_normalized(lines: Iterable[str], engine: str = "auto") -> Iterator[str]:
+    """Yield E.164 strings for the valid lines, in input order."""
+    engine = resolve_engine(engine)
+    if engine == "python":
+        for line in lines:
+            ok, e164 = normalize_us_number(line)
+            if ok:
+                yield e164
+        return
+
+    chunk: List[str] = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= NUMPY_CHUNK_LINES:
+            yield from _unpack_valid(pack_us_numbers(chunk))
+            chunk = []
+    if chunk:
+        yield from _unpack_valid(pack_us_numbers(chunk))
+
+
+def _unpack_valid(packed: "np.ndarray") -> Iterator[str]:
+    prefix = "+" + US_COUNTRY_CODE
+    for v in packed[packed != 0].tolist():
+        yield prefix + str(v)
+
+
+def cross_check_engines(lines: Sequence[str]) -> List[Tuple[str, str, str]]:
+    """
+    Run both engines over lines and return the disagreements as
+    (line, python_result, numpy_result); results are E.164 or "".
+    """
+    packed = pack_us_numbers(lines)
+    mismatches: List[Tuple[str, str, str]] = []
+    for line, v in zip(lines, packed.tolist()):
+        ok, expected = normalize_us_number(line)
+        got = unpack_e164(v) if v else ""
+        if (expected if ok else "") != got:
+            mismatches.append((line, expected if ok else "", got))
+    return mismatches
+
+
+def dedupe_numbers(lines: Iterable[str], keep_order: bool = True, engine: str = "auto") -> List[str]:
     seen: Set[str] = set()
     out: List[str] = []
-    for line in lines:
-        ok, e164 = normalize_us_number(line)
-        if not ok:
-            continue
+    for e164 in iter_normalized(lines, engine):
         if e164 in seen:
             continue
         seen.add(e164)
@@ -90,6 +273,160 @@ def dedupe_numbers(lines: Iterable[str], keep_order: bool = True) -> List[str]:
     return sorted(out)
 
 
+def day_index(day: Optional[datetime.date] = None) -> int:
+    """Days since HISTORY_EPOCH for day (default: today), as stored in history."""
+    day = day or datetime.date.today()
+    idx = (day - HISTORY_EPOCH).days
+    if not 0 <= idx <= 0xFFFF:
+        raise ValueError(f"date out of history range: {day}")
+    return idx
+
+
+class NumberHistory:
+    """
+    Last-seen day per number, for "don't contact again within N days".
+
+    Stored as two parallel arrays sorted by number: packed numbers (uint64)
+    and last-seen day index (uint16), i.e. 10 bytes per record. Uses numpy
+    arrays when available, stdlib arrays otherwise.
+
+    File format: HISTORY_MAGIC, record count (<Q), numbers (<u8), days (<u2).
+    """
+
+    def __init__(self) -> None:
+        if np is not None:
+            self.numbers = np.zeros(0, dtype=np.uint64)
+            self.days = np.zeros(0, dtype=np.uint16)
+        else:
+            self.numbers = array("Q")
+            self.days = array("H")
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    @classmethod
+    def load(cls, path: str) -> "NumberHistory":
+        """Load a history file; a missing file gives an empty history."""
+        hist = cls()
+        if not os.path.exists(path):
+            return hist
+        with open(path, "rb") as f:
+            header = f.read(len(HISTORY_MAGIC) + 8)
+            if header[:len(HISTORY_MAGIC)] != HISTORY_MAGIC or len(header) != len(HISTORY_MAGIC) + 8:
+                raise ValueError(f"not a history file: {path}")
+            (count,) = struct.unpack("<Q", header[len(HISTORY_MAGIC):])
+            if np is not None:
+                hist.numbers = np.fromfile(f, dtype="<u8", count=count).astype(np.uint64, copy=False)
+                hist.days = np.fromfile(f, dtype="<u2", count=count).astype(np.uint16, copy=False)
+            else:
+                try:
+                    hist.numbers.fromfile(f, count)
+                    hist.days.fromfile(f, count)
+                except EOFError:
+                    raise ValueError(f"truncated history file: {path}")
+                if sys.byteorder == "big":
+                    hist.numbers.byteswap()
+                    hist.days.byteswap()
+        if len(hist.numbers) != count or len(hist.days) != count:
+            raise ValueError(f"truncated history file: {path}")
+        return hist
+
+    def save(self, path: str) -> None:
+        """Write atomically (temp file + rename)."""
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HISTORY_MAGIC)
+            f.write(struct.pack("<Q", len(self.numbers)))
+            if np is not None:
+                f.write(self.numbers.astype("<u8", copy=False).tobytes())
+                f.write(self.days.astype("<u2", copy=False).tobytes())
+            else:
+                numbers, days = array("Q", self.numbers), array("H", self.days)
+                if sys.byteorder == "big":
+                    numbers.byteswap()
+                    days.byteswap()
+                numbers.tofile(f)
+                days.tofile(f)
+        os.replace(tmp, path)
+
+    def recent_mask(self, packed: Sequence[int], today: int, window: Optional[int] = None) -> List[bool]:
+        """
+        For each packed number, True if it was seen within the last window
+        days (today - last_seen < window). window=None means seen at all.
+        """
+        if np is not None:
+            q = np.asarray(packed, dtype=np.uint64)
+            if not len(self.numbers):
+                return [False] * len(q)
+            idx = np.minimum(np.searchsorted(self.numbers, q), len(self.numbers) - 1)
+            hit = self.numbers[idx] == q
+            if window is not None:
+                hit &= (today - self.days[idx].astype(np.int32)) < window
+            return hit.tolist()
+
+        out: List[bool] = []
+        nums, days = self.numbers, self.days
+        for n in packed:
+            j = bisect_left(nums, n)
+            hit = j < len(nums) and nums[j] == n
+            if hit and window is not None:
+                hit = today - days[j] < window
+            out.append(hit)
+        return out
+
+    def touch(self, packed: Iterable[int], today: int) -> None:
+        """Bulk-mark numbers as seen on day today (last-seen only moves forward)."""
+        if np is not None:
+            new = np.unique(np.fromiter(packed, dtype=np.uint64))
+            if not len(new):
+                return
+            idx = np.searchsorted(self.numbers, new)
+            hit = np.zeros(len(new), dtype=bool)
+            inside = idx < len(self.numbers)
+            hit[inside] = self.numbers[idx[inside]] == new[inside]
+            hit_idx = idx[hit]
+            self.days[hit_idx] = np.maximum(self.days[hit_idx], np.uint16(today))
+            miss = ~hit
+            self.numbers = np.insert(self.numbers, idx[miss], new[miss])
+            self.days = np.insert(self.days, idx[miss], np.uint16(today))
+            return
+
+        nums, days = self.numbers, self.days
+        out_n, out_d = array("Q"), array("H")
+        i = 0
+        for n in sorted(set(packed)):
+            j = bisect_left(nums, n, i)
+            out_n.extend(nums[i:j])
+            out_d.extend(days[i:j])
+            if j < len(nums) and nums[j] == n:
+                out_n.append(n)
+                out_d.append(max(days[j], today))
+                i = j + 1
+            else:
+                out_n.append(n)
+                out_d.append(today)
+                i = j
+        out_n.extend(nums[i:])
+        out_d.extend(days[i:])
+        self.numbers, self.days = out_n, out_d
+
+    def prune(self, today: int, max_age: int) -> int:
+        """Drop records last seen max_age or more days ago; return how many."""
+        before = len(self.numbers)
+        if np is not None:
+            keep = (today - self.days.astype(np.int32)) < max_age
+            self.numbers = self.numbers[keep]
+            self.days = self.days[keep]
+        else:
+            numbers, days = array("Q"), array("H")
+            for n, d in zip(self.numbers, self.days):
+                if today - d < max_age:
+                    numbers.append(n)
+                    days.append(d)
+            self.numbers, self.days = numbers, days
+        return before - len(self.numbers)
+
+
 def read_lines_from_file(path: str, encoding: str = "utf-8") -> Iterable[str]:
     with open(path, "r", encoding=encoding, errors="ignore") as f:
         for line in f:
@@ -127,6 +464,33 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
         action="store_true",
         help="Print stats about counts before writing output.",
     )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="auto",
+        help="Normalization engine; 'auto' uses numpy when installed.",
+    )
+    parser.add_argument(
+        "--history",
+        default=None,
+        help="History file of previously output numbers with last-seen day; "
+        "numbers in it are filtered out and the output is recorded into it.",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=None,
+        metavar="DAYS",
+        help="With --history, only filter numbers seen within the last DAYS days "
+        "(default: filter any number ever seen).",
+    )
+    parser.add_argument(
+        "--prune-days",
+        type=int,
+        default=None,
+        metavar="DAYS",
+        help="With --history, drop history records older than DAYS days before saving.",
+    )
     return parser.parse_args(argv)
 
 
@@ -143,16 +507,42 @@ def main(argv: List[str]) -> int:
         print(f"Error: input file not found: {input_path}", file=sys.stderr)
         return 2
 
+    try:
+        engine = resolve_engine(args.engine)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    if (args.window is not None or args.prune_days is not None) and not args.history:
+        print("Error: --window/--prune-days require --history", file=sys.stderr)
+        return 2
+    if (args.window is not None and args.window <= 0) or (args.prune_days is not None and args.prune_days <= 0):
+        print("Error: --window/--prune-days must be positive", file=sys.stderr)
+        return 2
+
+    history: Optional[NumberHistory] = None
+    if args.history:
+        try:
+            history = NumberHistory.load(args.history)
+        except (OSError, ValueError) as e:
+            print(f"Error: cannot read history: {e}", file=sys.stderr)
+            return 2
+        # Fail before writing output: numbers delivered but not recorded
+        # would count as new again on the next run.
+        history_dir = os.path.dirname(os.path.abspath(args.history))
+        if not os.path.isdir(history_dir) or not os.access(history_dir, os.W_OK):
+            print(f"Error: cannot write history: directory not writable: {history_dir}", file=sys.stderr)
+            return 2
+    today = day_index()
+
     lines = list(read_lines_from_file(input_path))
 
     # For stats: count valid and unique
-    normalized_all: List[str] = []
-    for line in lines:
-        ok, e164 = normalize_us_number(line)
-        if ok:
-            normalized_all.append(e164)
+    normalized_all: List[str] = list(iter_normalized(lines, engine))
 
-    unique_numbers = dedupe_numbers(lines, keep_order=not args.no_keep_order)
+    unique_numbers = list(dict.fromkeys(normalized_all))
+    if args.no_keep_order:
+        unique_numbers.sort()
 
     if args.show_stats:
         total = len(lines)
@@ -162,9 +552,29 @@ def main(argv: List[str]) -> int:
         print(f"Valid US numbers: {valid}")
         print(f"Unique after dedupe: {unique}")
 
+    if history is not None:
+        recent = history.recent_mask([pack_e164(n) for n in unique_numbers], today, args.window)
+        before = len(unique_numbers)
+        unique_numbers = [n for n, r in zip(unique_numbers, recent) if not r]
+        if args.show_stats:
+            print(f"Filtered by history: {before - len(unique_numbers)}")
+
     output_path = args.output or derive_output_path(input_path)
     write_lines_to_file(output_path, unique_numbers)
     print(f"Wrote {len(unique_numbers)} unique numbers to: {output_path}")
+
+    if history is not None:
+        history.touch((pack_e164(n) for n in unique_numbers), today)
+        if args.prune_days is not None:
+            pruned = history.prune(today, args.prune_days)
+            if args.show_stats:
+                print(f"Pruned from history: {pruned}")
+        try:
+            history.save(args.history)
+        except OSError as e:
+            print(f"Error: cannot write history: {e}", file=sys.stderr)
+            return 2
+        print(f"History now holds {len(history)} numbers: {args.history}")
     return 0
 
 
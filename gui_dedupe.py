@@ -5,12 +5,13 @@ import sys
 import json
 import csv
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-from typing import List, Set, Tuple, Dict
+from tkinter import filedialog, messagebox, simpledialog, ttk
+from typing import List, Set, Tuple, Dict, Optional
 
 # Reuse normalization logic from CLI module
 try:
-    from dedupe_us_numbers import normalize_us_number, read_lines_from_file, write_lines_to_file, dedupe_numbers
+    from dedupe_us_numbers import normalize_us_number, read_lines_from_file, write_lines_to_file, dedupe_numbers, iter_normalized
+    from dedupe_us_numbers import NumberHistory, day_index, pack_e164
 except Exception as e:
     print("Failed to import dedupe_us_numbers.py. Ensure it is in the same directory.", file=sys.stderr)
     raise
@@ -24,6 +25,8 @@ class DedupeGUI(tk.Tk):
 
         self.base_path_var = tk.StringVar()
         self.new_path_var = tk.StringVar()
+        self.history_path_var = tk.StringVar()
+        self.window_var = tk.StringVar()  # days; blank = any time
         self.keep_order_var = tk.BooleanVar(value=True)
         self.sort_output_var = tk.BooleanVar(value=False)
 
@@ -32,6 +35,20 @@ class DedupeGUI(tk.Tk):
         self.base_unique: List[str] = []   # normalized & unique from base
         self.new_unique_all: List[str] = []  # for multiple new files combined
 
+        # Incremental analysis state: re-analyzing only touches files whose
+        # selection (or content on disk) changed since the last run.
+        self._base_sig: Tuple = ()
+        self._base_set: Set[str] = set()
+        self._new_files: Dict[str, Tuple[Tuple, List[str]]] = {}  # path -> (sig, unique numbers)
+        self._new_counts: Dict[str, int] = {}  # number -> how many selected files contain it
+        self._view_paths: List[str] = []  # selection order new_unique_all/duplicates/uniques_new follow
+        # Optional history: new numbers seen within the window count as duplicates.
+        self._history: Optional[NumberHistory] = None
+        self._history_sig: Tuple = ()
+        self._window: Optional[int] = None
+        self._today = day_index()
+        self._split_key: Tuple = ()  # (base, history, window, day) the split was made against
+
         self.prefs_path = os.path.join(os.path.dirname(__file__), "app_prefs.json")
         self._load_prefs()
 
@@ -59,6 +76,9 @@ class DedupeGUI(tk.Tk):
         menu_actions.add_command(label="分析对比", command=self._analyze, accelerator="Cmd+Enter")
         menu_actions.add_command(label="更新底库=底库∪新唯一…", command=self._update_base)
         menu_actions.add_command(label="将仅新唯一另存为新底库…", command=self._save_uniques_as_base)
+        menu_actions.add_separator()
+        menu_actions.add_command(label="记录仅新唯一到历史库", command=self._record_history)
+        menu_actions.add_command(label="清理历史库过期记录…", command=self._prune_history)
         menubar.add_cascade(label="操作", menu=menu_actions)
 
         menu_view = tk.Menu(menubar, tearoff=0)
@@ -89,6 +109,15 @@ class DedupeGUI(tk.Tk):
         ttk.Entry(frm_top, textvariable=self.new_path_var, width=80).grid(row=1, column=1, padx=6, pady=(6, 0))
         ttk.Button(frm_top, text="选择…", command=self._choose_new_multi).grid(row=1, column=2, pady=(6, 0))
 
+        # History row (optional): file + window in days
+        ttk.Label(frm_top, text="历史库(可选):").grid(row=2, column=0, sticky=tk.W, pady=(6, 0))
+        ttk.Entry(frm_top, textvariable=self.history_path_var, width=80).grid(row=2, column=1, padx=6, pady=(6, 0))
+        hist_btns = ttk.Frame(frm_top)
+        hist_btns.grid(row=2, column=2, pady=(6, 0))
+        ttk.Button(hist_btns, text="选择…", command=self._choose_history).pack(side=tk.LEFT)
+        ttk.Label(hist_btns, text="窗口(天):").pack(side=tk.LEFT, padx=(6, 0))
+        ttk.Entry(hist_btns, textvariable=self.window_var, width=6).pack(side=tk.LEFT)
+
         # Actions
         frm_actions = ttk.Frame(self)
         frm_actions.pack(fill=tk.X, padx=10, pady=10)
@@ -110,7 +139,7 @@ class DedupeGUI(tk.Tk):
         paned.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
         # Duplicates panel
-        frm_dup = ttk.Labelframe(paned, text="重复（出现在两边）")
+        frm_dup = ttk.Labelframe(paned, text="重复（底库中已有或历史窗口内出现过）")
         self.list_duplicates = tk.Listbox(frm_dup)
         scrollbar_dup = ttk.Scrollbar(frm_dup, orient=tk.VERTICAL, command=self.list_duplicates.yview)
         self.list_duplicates.configure(yscrollcommand=scrollbar_dup.set)
@@ -176,16 +205,97 @@ class DedupeGUI(tk.Tk):
         self.new_path_var.set("; ".join(paths))
         self._set_status(f"新导入已选择：{len(paths)} 个文件")
 
+    def _choose_history(self) -> None:
+        path = filedialog.asksaveasfilename(
+            title="选择或新建历史库",
+            defaultextension=".hist",
+            initialfile="history.hist",
+            confirmoverwrite=False,
+            filetypes=[("History files", "*.hist"), ("All files", "*.*")],
+        )
+        if path:
+            self.history_path_var.set(path)
+            self._set_status(f"历史库已选择：{os.path.basename(path)}")
+
     def _read_and_normalize(self, path: str) -> List[str]:
-        lines = list(read_lines_from_file(path))
-        normalized: List[str] = []
-        for line in lines:
-            ok, e164 = normalize_us_number(line)
-            if ok:
-                normalized.append(e164)
+        normalized: List[str] = list(iter_normalized(read_lines_from_file(path)))
         unique = list(dict.fromkeys(normalized))  # preserve order unique
         return unique
 
+    def _file_sig(self, path: str) -> Tuple:
+        st = os.stat(path)
+        return (path, st.st_mtime_ns, st.st_size)
+
+    def _base_signature(self, base: str) -> Tuple:
+        if os.path.isdir(base):
+            return tuple(self._file_sig(fp) for fp in self._iter_txt_files(base))
+        return (self._file_sig(base),)
+
+    def _blocked(self, numbers: List[str]) -> List[bool]:
+        """True for numbers that count as duplicates: in base, or recent in history."""
+        if self._history is None:
+            return [n in self._base_set for n in numbers]
+        recent = self._history.recent_mask([pack_e164(n) for n in numbers], self._today, self._window)
+        return [r or n in self._base_set for n, r in zip(numbers, recent)]
+
+    def _append_split(self, numbers: List[str]) -> None:
+        """Append numbers (in order) to duplicates or uniques_new."""
+        for n, blocked in zip(numbers, self._blocked(numbers)):
+            if blocked:
+                self.duplicates.append(n)
+            else:
+                self.uniques_new.append(n)
+
+    def _add_new_numbers(self, numbers: List[str]) -> List[str]:
+        """Count a file's numbers in; return those new to the selection."""
+        fresh: List[str] = []
+        for n in numbers:
+            c = self._new_counts.get(n, 0)
+            self._new_counts[n] = c + 1
+            if not c:
+                fresh.append(n)
+        return fresh
+
+    def _remove_new_numbers(self, numbers: List[str]) -> None:
+        for n in numbers:
+            c = self._new_counts[n] - 1
+            if c:
+                self._new_counts[n] = c
+                continue
+            del self._new_counts[n]
+
+    def _reset_incremental(self) -> None:
+        self._base_sig = ()
+        self._base_set = set()
+        self._new_files = {}
+        self._new_counts = {}
+        self._view_paths = []
+        self._history = None
+        self._history_sig = ()
+        self._split_key = ()
+
+    def _clear_results(self) -> None:
+        self.duplicates = []
+        self.uniques_new = []
+        self.base_unique = []
+        self.new_unique_all = []
+        self._reset_incremental()
+        self._refresh_lists()
+        try:
+            self.frm_dup.configure(text="重复（底库中已有或历史窗口内出现过）")
+            self.frm_unique.configure(text="仅新文件中的唯一（可加入底库）")
+        except Exception:
+            pass
+
+    def _parse_window(self) -> Optional[int]:
+        text = self.window_var.get().strip()
+        if not text:
+            return None
+        window = int(text)
+        if window <= 0:
+            raise ValueError
+        return window
+
     def _analyze(self) -> None:
         base = self.base_path_var.get().strip()
         new_value = self.new_path_var.get().strip()
@@ -195,6 +305,12 @@ class DedupeGUI(tk.Tk):
         if not new_value:
             messagebox.showerror("错误", "请先选择有效的新导入 TXT 文件(可多选)")
             return
+        try:
+            window = self._parse_window()
+        except ValueError:
+            messagebox.showerror("错误", "窗口(天)需为正整数，留空表示不限时间")
+            return
+        history_path = self.history_path_var.get().strip()
 
         try:
             paths_new: List[str] = []
@@ -205,53 +321,99 @@ class DedupeGUI(tk.Tk):
                 if not os.path.isfile(p):
                     continue
                 paths_new.append(p)
+            paths_new = list(dict.fromkeys(paths_new))
+
+            # Work out what changed since the last analysis.
+            base_sig = self._base_signature(base)
+            sigs = {p: self._file_sig(p) for p in paths_new}
+            removed = {p for p in self._new_files if sigs.get(p) != self._new_files[p][0]}
+            added = [p for p in paths_new if p not in self._new_files or p in removed]
 
-            total_steps = 1 + len(paths_new)
+            total_steps = (1 if base_sig != self._base_sig else 0) + len(added)
             step_idx = 0
             self._progress_start(total_steps, label="读取底库…")
 
+            for p in removed:
+                self._remove_new_numbers(self._new_files.pop(p)[1])
+
             # read base: folder of .txt files OR single TXT file
-            if os.path.isdir(base):
-                base_files = self._iter_txt_files(base)
-                base_numbers: List[str] = []
-                for fp in base_files:
-                    base_numbers.extend(self._read_and_normalize(fp))
-                self.base_unique = list(dict.fromkeys(base_numbers))
-            else:
-                self.base_unique = self._read_and_normalize(base)
-            step_idx += 1
-            self._progress_step(step_idx, total_steps, label="读取新文件…")
+            if base_sig != self._base_sig:
+                if os.path.isdir(base):
+                    base_numbers: List[str] = []
+                    for fp in self._iter_txt_files(base):
+                        base_numbers.extend(self._read_and_normalize(fp))
+                    self.base_unique = list(dict.fromkeys(base_numbers))
+                else:
+                    self.base_unique = self._read_and_normalize(base)
+                self._base_sig = base_sig
+                self._base_set = set(self.base_unique)
+                step_idx += 1
+                self._progress_step(step_idx, total_steps, label="读取新文件…")
 
-            new_unique_all: List[str] = []
-            for p in paths_new:
-                new_unique_all.extend(self._read_and_normalize(p))
+            if not history_path:
+                self._history, self._history_sig = None, ()
+            else:
+                history_sig = self._file_sig(history_path) if os.path.exists(history_path) else (history_path,)
+                if history_sig != self._history_sig:
+                    self._history = NumberHistory.load(history_path)
+                    self._history_sig = history_sig
+            self._window = window
+            self._today = day_index()
+
+            fresh: List[str] = []  # numbers new to the selection, in file order
+            for p in added:
+                numbers = self._read_and_normalize(p)
+                self._new_files[p] = (sigs[p], numbers)
+                fresh.extend(self._add_new_numbers(numbers))
                 step_idx += 1
                 self._progress_step(step_idx, total_steps, label=f"已处理 {step_idx}/{total_steps}")
-            # order-unique combined
-            self.new_unique_all = list(dict.fromkeys(new_unique_all))
         except Exception as e:
+            # state may be half-updated; start from scratch next time and
+            # drop results that were split against the discarded state
+            self._clear_results()
+            self.stats_var.set("分析失败，结果已清空")
             messagebox.showerror("读取失败", str(e))
             return
         finally:
             self._progress_done()
 
-        set_base: Set[str] = set(self.base_unique)
-        set_new: Set[str] = set(self.new_unique_all)
-
-        self.duplicates = [n for n in self.new_unique_all if n in set_base]
-        self.uniques_new = [n for n in self.new_unique_all if n not in set_base]
+        # Ordered views follow the current selection order, as a fresh
+        # analysis would. Appending files only extends them; a removal or
+        # reorder rebuilds the order from the cached per-file numbers.
+        kept = len(self._view_paths)
+        if removed or not kept or paths_new[:kept] != self._view_paths:
+            self.new_unique_all = list(dict.fromkeys(n for p in paths_new for n in self._new_files[p][1]))
+            resplit = True
+        else:
+            self.new_unique_all.extend(fresh)
+            resplit = False
+        self._view_paths = paths_new
+
+        # base, history, window or day changed: split everything again
+        split_key = (self._base_sig, self._history_sig, self._window, self._today)
+        if resplit or split_key != self._split_key:
+            self.duplicates = []
+            self.uniques_new = []
+            self._append_split(self.new_unique_all)
+            self._split_key = split_key
+        else:
+            self._append_split(fresh)
 
         self._refresh_lists()
 
+        history_note = ""
+        if self._history is not None:
+            span = f"{self._window} 天内" if self._window else "不限时间"
+            history_note = f"；历史库 {len(self._history)} 条（{span}）"
         self.stats_var.set(
-            f"底库有效唯一：{len(self.base_unique)}，新文件有效唯一：{len(set_new)}；重复：{len(self.duplicates)}，仅新唯一：{len(self.uniques_new)}"
+            f"底库有效唯一：{len(self.base_unique)}，新文件有效唯一：{len(self.new_unique_all)}；重复：{len(self.duplicates)}，仅新唯一：{len(self.uniques_new)}{history_note}"
         )
         try:
-            self.frm_dup.configure(text=f"重复（出现在两边）— {len(self.duplicates)} 条")
+            self.frm_dup.configure(text=f"重复（底库中已有或历史窗口内出现过）— {len(self.duplicates)} 条")
             self.frm_unique.configure(text=f"仅新文件中的唯一（可加入底库）— {len(self.uniques_new)} 条")
         except Exception:
             pass
-        self._set_status("分析完成")
+        self._set_status(f"分析完成（新增 {len(added)} 个文件，移除 {len(removed)} 个文件）")
         self._progress_done()
 
     def _refresh_lists(self) -> None:
@@ -316,19 +478,24 @@ class DedupeGUI(tk.Tk):
             set_base = set(base)
             set_new = set(new_all)
             all_numbers = list(dict.fromkeys(base + new_all))
+            # in_history: seen in the history within the analyzed window
+            if self._history is not None:
+                recent = self._history.recent_mask([pack_e164(n) for n in all_numbers], self._today, self._window)
+            else:
+                recent = [False] * len(all_numbers)
             with open(path, "w", newline="", encoding="utf-8") as f:
                 writer = csv.writer(f)
-                writer.writerow(["number", "in_base", "in_new", "status"])  # status: duplicate/new_unique/base_only
-                for n in all_numbers:
+                writer.writerow(["number", "in_base", "in_history", "in_new", "status"])  # status: duplicate/new_unique/base_only
+                for n, in_history in zip(all_numbers, recent):
                     in_base = n in set_base
                     in_new = n in set_new
-                    if in_base and in_new:
+                    if in_new and (in_base or in_history):
                         status = "duplicate"
-                    elif in_new and not in_base:
+                    elif in_new:
                         status = "new_unique"
                     else:
                         status = "base_only"
-                    writer.writerow([n, int(in_base), int(in_new), status])
+                    writer.writerow([n, int(in_base), int(in_history), int(in_new), status])
             messagebox.showinfo("成功", f"已导出 CSV 报告\n{path}")
         except Exception as e:
             messagebox.showerror("导出失败", str(e))
@@ -395,14 +562,46 @@ class DedupeGUI(tk.Tk):
         except Exception as e:
             messagebox.showerror("写入失败", str(e))
 
+    def _record_history(self) -> None:
+        path = self.history_path_var.get().strip()
+        if not path:
+            messagebox.showerror("错误", "请先选择历史库文件")
+            return
+        if not self.uniques_new:
+            messagebox.showinfo("提示", "暂无‘仅新唯一’可记录")
+            return
+        try:
+            history = NumberHistory.load(path)
+            history.touch((pack_e164(n) for n in self.uniques_new), day_index())
+            history.save(path)
+            self._set_status(f"已记录 {len(self.uniques_new)} 条到历史库，共 {len(history)} 条")
+            messagebox.showinfo("成功", f"已记录 {len(self.uniques_new)} 条到历史库，共 {len(history)} 条\n{path}")
+        except Exception as e:
+            messagebox.showerror("写入失败", str(e))
+
+    def _prune_history(self) -> None:
+        path = self.history_path_var.get().strip()
+        if not path or not os.path.isfile(path):
+            messagebox.showerror("错误", "请先选择已有的历史库文件")
+            return
+        days = simpledialog.askinteger("清理历史库", "删除多少天以前的记录（天数）：", minvalue=1, parent=self)
+        if not days:
+            return
+        try:
+            history = NumberHistory.load(path)
+            removed = history.prune(day_index(), days)
+            history.save(path)
+            self._set_status(f"已清理历史库 {removed} 条，剩余 {len(history)} 条")
+            messagebox.showinfo("成功", f"已清理 {removed} 条（{days} 天以前），剩余 {len(history)} 条\n{path}")
+        except Exception as e:
+            messagebox.showerror("写入失败", str(e))
+
     def _clear_session(self) -> None:
         self.base_path_var.set("")
         self.new_path_var.set("")
-        self.duplicates = []
-        self.uniques_new = []
-        self.base_unique = []
-        self.new_unique_all = []
-        self._refresh_lists()
+        self.history_path_var.set("")
+        self.window_var.set("")
+        self._clear_results()
         self.stats_var.set("已清空当前会话")
         self._set_status("已清空")
 
@@ -445,6 +644,8 @@ class DedupeGUI(tk.Tk):
                     data: Dict[str, str] = json.load(f)
                 self.base_path_var.set(data.get("last_base", ""))
                 self.new_path_var.set(data.get("last_new", ""))
+                self.history_path_var.set(data.get("last_history", ""))
+                self.window_var.set(str(data.get("window", "")))
                 self.keep_order_var.set(bool(data.get("keep_order", True)))
                 self.sort_output_var.set(bool(data.get("sort_output", False)))
         except Exception:
@@ -461,6 +662,8 @@ class DedupeGUI(tk.Tk):
             data = {
                 "last_base": self.base_path_var.get(),
                 "last_new": self.new_path_var.get(),
+                "last_history": self.history_path_var.get(),
+                "window": self.window_var.get(),
                 "keep_order": bool(self.keep_order_var.get()),
                 "sort_output": bool(self.sort_output_var.get()),
             }
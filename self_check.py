@@ -2,6 +2,45 @@
 
 import os
 import sys
+import tempfile
+from typing import List
+
+
+def check_history(core) -> List[str]:
+    """Exercise NumberHistory against hand-computed results; return failures."""
+    failures: List[str] = []
+    a, b, c, d = 4155550123, 2125550100, 3105550199, 6465550111
+    today = 1000
+    hist = core.NumberHistory()
+    hist.touch([a, b], 990)
+    hist.touch([c, b], today)
+    hist.touch([a], 980)  # older sighting must not move last-seen back
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.hist")
+        hist.save(path)
+        hist = core.NumberHistory.load(path)
+        if [int(n) for n in hist.numbers] != [b, c, a] or [int(x) for x in hist.days] != [today, today, 990]:
+            failures.append(f"round-trip: {list(hist.numbers)} {list(hist.days)}")
+        # a was seen exactly 10 days ago: outside a 10-day window, inside 11
+        for window, expected in ((10, [False, True, True, False]), (11, [True, True, True, False]), (None, [True, True, True, False])):
+            got = list(hist.recent_mask([a, b, c, d], today, window))
+            if got != expected:
+                failures.append(f"recent_mask window={window}: {got}")
+        removed = hist.prune(today, 10)
+        if removed != 1 or [int(n) for n in hist.numbers] != [b, c]:
+            failures.append(f"prune: removed {removed}, left {list(hist.numbers)}")
+
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[:-2])
+        try:
+            core.NumberHistory.load(path)
+            failures.append("truncated file loaded without error")
+        except ValueError:
+            pass
+    return failures
+
 
 def main() -> int:
     base_dir = os.path.dirname(__file__)
@@ -33,6 +72,35 @@ def main() -> int:
         print("[SelfCheck] Normalize check failed")
         return 4
 
+    # 5) numpy engine must agree with the scalar path (optional)
+    from dedupe_us_numbers import numpy_available, cross_check_engines
+    if numpy_available():
+        samples = [
+            "(415) 555-0123", "1-415-555-0123", "+1 415 555 0123", "415.555.0123 x200",
+            "+4155550123", "4151110123", "0155550123", "999", "", "  14155550123  ",
+            "４１５５５５０１２３", "+1 ４１５ 555 0123", "4155550123\ud800",
+        ]
+        mismatches = cross_check_engines(samples)
+        print("[SelfCheck] NumPy engine cross-check:", "OK" if not mismatches else mismatches)
+        if mismatches:
+            return 5
+    else:
+        print("[SelfCheck] NumPy engine: not installed (optional)")
+
+    # 6) history store, on every available backend
+    import dedupe_us_numbers as core
+    backends = [("numpy", core.np), ("stdlib", None)] if numpy_available() else [("stdlib", None)]
+    saved_np = core.np
+    try:
+        for name, np_mod in backends:
+            core.np = np_mod
+            failures = check_history(core)
+            print(f"[SelfCheck] History store ({name}):", "OK" if not failures else failures)
+            if failures:
+                return 6
+    finally:
+        core.np = saved_np
+
     print("[SelfCheck] All good.")
     return 0
 